@@ -1,4 +1,5 @@
 import os
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,7 +13,26 @@ class Settings(BaseSettings):
     
     # AI Model Configuration
     MODEL_NAME: str = "facebook/detr-resnet-50"
-    
+
+    # Detection Filtering (shared by full-frame and tiled inference)
+    DETECTION_THRESHOLD: float = Field(0.4, gt=0, le=1)  # Minimum detector confidence
+    MIN_BOX_AREA: int = Field(4000, ge=0)  # Minimum box area in original frame pixels (both modes)
+
+    # Tiled Inference (high-resolution drone footage)
+    TILED_INFERENCE: bool = False
+    TILE_SIZE: int = Field(800, gt=0)            # Tile width/height in pixels
+    TILE_OVERLAP: int = Field(160, ge=0)         # Overlap between neighbouring tiles in pixels
+    TILES_PER_BATCH: int = Field(8, gt=0)        # Tiles per forward pass
+    TILE_FRAMES_PER_BATCH: int = Field(1, gt=0)  # Frames whose tiles are pooled together
+    TILE_MERGE_IOS: float = Field(0.5, gt=0, le=1)  # Intersection-over-smaller-area threshold for seam merging
+
+    @model_validator(mode="after")
+    def check_tile_overlap(self):
+        # Only enforced when tiling is on, so bad TILE_* values don't take down the API
+        if self.TILED_INFERENCE and self.TILE_OVERLAP >= self.TILE_SIZE:
+            raise ValueError("TILE_OVERLAP must be smaller than TILE_SIZE")
+        return self
+
     class Config:
         env_file = ".env"
         extra = "ignore" # Ignore extra fields in .env
@@ -34,6 +34,188 @@ class CowCounterEngine:
             raise e
         
         self.allowed_labels = ['bird', 'sheep', 'cow', 'bear', 'dog', 'horse', 'zebra']
+        self.allowed_class_ids = torch.tensor(
+            [class_id for class_id, name in self.model.config.id2label.items() if name in self.allowed_labels],
+            device=self.device
+        )
+
+    @staticmethod
+    def _batch_frames(frame_generator, batch_size):
+        batch = []
+        for frame in frame_generator:
+            batch.append(frame)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _tile_origins(length, tile_size, overlap):
+        # Tiles are clamped to the frame and the last one is flushed to the edge
+        if not 0 <= overlap < tile_size:
+            raise ValueError("Tile overlap must be in [0, tile_size)")
+        tile = min(tile_size, length)
+        origins = list(range(0, length - tile + 1, tile_size - overlap))
+        if origins[-1] + tile < length:
+            origins.append(length - tile)
+        return origins, tile
+
+    def _detect_full(self, frames):
+        detections_per_frame = []
+        for frame in frames:
+            img_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            inputs = self.processor(images=img_pil, return_tensors="pt").to(self.device)
+            
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+
+            target_sizes = torch.tensor([img_pil.size[::-1]]).to(self.device)
+            results = self.processor.post_process_object_detection(
+                outputs, target_sizes=target_sizes, threshold=settings.DETECTION_THRESHOLD
+            )[0]
+
+            detections = sv.Detections.from_transformers(transformers_results=results)
+
+            # Filtering Logic
+            valid_indices = []
+            for idx, class_id in enumerate(detections.class_id):
+                class_name = self.model.config.id2label[class_id]
+                if class_name in self.allowed_labels:
+                    valid_indices.append(idx)
+            
+            if valid_indices:
+                detections = detections[np.array(valid_indices)]
+                detections = detections[detections.area > settings.MIN_BOX_AREA]
+            else:
+                detections = sv.Detections.empty()
+
+            detections_per_frame.append(detections)
+        return detections_per_frame
+
+    @staticmethod
+    def _merge_overlapping(boxes, scores, tile_ids, threshold):
+        # Greedy merge of one frame's boxes on intersection-over-smaller-area (IoS). Unlike IoU,
+        # a box cut off at a tile edge scores ~1.0 against the full box from the neighbouring tile.
+        # Only boxes from different tiles are merged; DETR already de-duplicates within a tile.
+        order = scores.argsort(descending=True)
+        ordered = boxes[order]
+        if len(ordered) == 0:
+            return order, ordered
+
+        top_left = torch.max(ordered[:, None, :2], ordered[None, :, :2])
+        bottom_right = torch.min(ordered[:, None, 2:], ordered[None, :, 2:])
+        intersection = (bottom_right - top_left).clamp(min=0).prod(dim=-1)
+        areas = (ordered[:, 2] - ordered[:, 0]) * (ordered[:, 3] - ordered[:, 1])
+        ios = intersection / torch.min(areas[:, None], areas[None, :]).clamp(min=1e-6)
+
+        other_tile = tile_ids[order][:, None] != tile_ids[order][None, :]
+        overlaps = (ios > threshold) & other_tile
+
+        # Each box is owned by itself unless a higher-scoring box from another tile claims it.
+        # Only seam candidates enter the greedy pass, so it stays short.
+        owner = torch.arange(len(ordered), device=ordered.device)
+        candidates = overlaps.any(dim=1).nonzero().flatten().tolist()
+        if candidates:
+            overlaps_cpu = overlaps.cpu()
+            positions = torch.arange(len(ordered))
+            owner_cpu = positions.clone()
+            for idx in candidates:
+                if owner_cpu[idx] != idx:
+                    continue
+                partners = overlaps_cpu[idx] & (owner_cpu == positions)
+                owner_cpu[partners] = idx
+            owner = owner_cpu.to(ordered.device)
+
+        # Kept boxes grow to the union of what they absorbed, so a truncated seam
+        # fragment never shrinks the box handed to the tracker
+        owner_index = owner[:, None].expand(-1, 2)
+        merged = torch.cat([
+            ordered[:, :2].scatter_reduce(0, owner_index, ordered[:, :2], reduce="amin"),
+            ordered[:, 2:].scatter_reduce(0, owner_index, ordered[:, 2:], reduce="amax"),
+        ], dim=1)
+
+        keep = owner == torch.arange(len(ordered), device=ordered.device)
+        return order[keep], merged[keep]
+
+    def _merge_tile_results(self, results, tile_frames, tile_offsets, num_frames):
+        per_frame = [{"boxes": [], "scores": [], "labels": [], "tiles": []} for _ in range(num_frames)]
+        for tile_idx, result in enumerate(results):
+            frame = per_frame[tile_frames[tile_idx]]
+            # Shift tile-local boxes back into frame coordinates
+            frame["boxes"].append(result["boxes"] + tile_offsets[tile_idx])
+            frame["scores"].append(result["scores"])
+            frame["labels"].append(result["labels"])
+            frame["tiles"].append(torch.full_like(result["labels"], tile_idx))
+
+        detections_per_frame = []
+        for frame in per_frame:
+            if not frame["boxes"]:
+                detections_per_frame.append(sv.Detections.empty())
+                continue
+
+            boxes = torch.cat(frame["boxes"])
+            scores = torch.cat(frame["scores"])
+            class_ids = torch.cat(frame["labels"])
+            tile_ids = torch.cat(frame["tiles"])
+
+            # Filtering Logic
+            keep = torch.isin(class_ids, self.allowed_class_ids.to(class_ids.device))
+            boxes, scores, class_ids, tile_ids = boxes[keep], scores[keep], class_ids[keep], tile_ids[keep]
+
+            # Merge duplicates across tile seams (class-agnostic, since the same
+            # animal may get different labels in neighbouring tiles)
+            keep, boxes = self._merge_overlapping(boxes, scores, tile_ids, settings.TILE_MERGE_IOS)
+            scores, class_ids = scores[keep], class_ids[keep]
+
+            # Area filter runs after merging so seam fragments don't decide what survives
+            keep = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]) > settings.MIN_BOX_AREA
+            if keep.any():
+                detections = sv.Detections(
+                    xyxy=boxes[keep].cpu().numpy(),
+                    confidence=scores[keep].cpu().numpy(),
+                    class_id=class_ids[keep].cpu().numpy()
+                )
+            else:
+                detections = sv.Detections.empty()
+            detections_per_frame.append(detections)
+        return detections_per_frame
+
+    def _detect_tiled(self, frames):
+        # The tile grid is computed once per batch, so every frame must share the same size
+        height, width = frames[0].shape[:2]
+        if any(frame.shape[:2] != (height, width) for frame in frames):
+            raise ValueError("All frames in a tiled batch must have the same resolution")
+
+        xs, tile_w = self._tile_origins(width, settings.TILE_SIZE, settings.TILE_OVERLAP)
+        ys, tile_h = self._tile_origins(height, settings.TILE_SIZE, settings.TILE_OVERLAP)
+
+        # Cut every frame into overlapping tiles (full resolution; the processor must not resize them)
+        tiles, tile_frames, tile_offsets = [], [], []
+        for frame_idx, frame in enumerate(frames):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            for y in ys:
+                for x in xs:
+                    tiles.append(Image.fromarray(rgb[y:y + tile_h, x:x + tile_w]))
+                    tile_frames.append(frame_idx)
+                    tile_offsets.append([x, y, x, y])
+        tile_offsets = torch.tensor(tile_offsets, dtype=torch.float32, device=self.device)
+
+        # Batched Inference over tiles
+        results = []
+        for start in range(0, len(tiles), settings.TILES_PER_BATCH):
+            chunk = tiles[start:start + settings.TILES_PER_BATCH]
+            inputs = self.processor(images=chunk, do_resize=False, return_tensors="pt").to(self.device)
+
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+
+            target_sizes = torch.tensor([[tile_h, tile_w]] * len(chunk)).to(self.device)
+            results.extend(self.processor.post_process_object_detection(
+                outputs, target_sizes=target_sizes, threshold=settings.DETECTION_THRESHOLD
+            ))
+
+        return self._merge_tile_results(results, tile_frames, tile_offsets, len(frames))
 
     def process_video(self, source_path, target_path, progress_callback=None):
         video_info = sv.VideoInfo.from_video_path(source_path)
@@ -60,59 +242,49 @@ class CowCounterEngine:
 
         frame_generator = sv.get_video_frames_generator(source_path)
         
+        if settings.TILED_INFERENCE:
+            print(f"   [+] Tiled Inference: {settings.TILE_SIZE}px tiles, "
+                  f"{settings.TILE_OVERLAP}px overlap, {settings.TILES_PER_BATCH} tiles/batch")
+            detect = self._detect_tiled
+            frames_per_batch = settings.TILE_FRAMES_PER_BATCH
+        else:
+            detect = self._detect_full
+            frames_per_batch = 1
+        
         print("   [+] Starting Inference Loop...")
         
         total_frames = video_info.total_frames
+        progress_bar = tqdm(total=total_frames, unit="frame")
+        i = 0
         
         with sv.VideoSink(target_path, video_info=video_info) as sink:
-            for i, frame in enumerate(tqdm(frame_generator, total=total_frames, unit="frame")):
-                
-                # Progress Reporting
-                if progress_callback and (i % 30 == 0):
-                    percent = round((i / total_frames) * 100)
-                    progress_callback(percent)
+            for frames in self._batch_frames(frame_generator, frames_per_batch):
 
                 # Inference
-                img_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-                inputs = self.processor(images=img_pil, return_tensors="pt").to(self.device)
-                
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
-
-                target_sizes = torch.tensor([img_pil.size[::-1]]).to(self.device)
-                results = self.processor.post_process_object_detection(
-                    outputs, target_sizes=target_sizes, threshold=0.4
-                )[0]
-
-                detections = sv.Detections.from_transformers(transformers_results=results)
-
-                # Filtering Logic
-                valid_indices = []
-                for idx, class_id in enumerate(detections.class_id):
-                    class_name = self.model.config.id2label[class_id]
-                    if class_name in self.allowed_labels:
-                        valid_indices.append(idx)
-                
-                if valid_indices:
-                    detections = detections[np.array(valid_indices)]
-                    detections = detections[detections.area > 4000] 
-                else:
-                    detections = sv.Detections.empty()
-
-                # Update State
-                detections = tracker.update_with_detections(detections)
-                line_zone.trigger(detections=detections)
-
-                # Annotation
-                labels = [f"Cow #{id}" for id in detections.tracker_id]
-                
-                frame = trace_annotator.annotate(frame, detections)
-                frame = box_annotator.annotate(frame, detections)
-                frame = label_annotator.annotate(frame, detections, labels)
-                frame = line_annotator.annotate(frame, line_counter=line_zone)
-                
-                sink.write_frame(frame)
+                for frame, detections in zip(frames, detect(frames)):
+                    
+                    # Progress Reporting
+                    if progress_callback and (i % 30 == 0):
+                        percent = round((i / total_frames) * 100)
+                        progress_callback(percent)
+
+                    # Update State
+                    detections = tracker.update_with_detections(detections)
+                    line_zone.trigger(detections=detections)
+
+                    # Annotation
+                    labels = [f"Cow #{id}" for id in detections.tracker_id]
+                    
+                    frame = trace_annotator.annotate(frame, detections)
+                    frame = box_annotator.annotate(frame, detections)
+                    frame = label_annotator.annotate(frame, detections, labels)
+                    frame = line_annotator.annotate(frame, line_counter=line_zone)
+                    
+                    sink.write_frame(frame)
+                    progress_bar.update(1)
+                    i += 1
 
+        progress_bar.close()
         print("   [+] Processing Finished.")
         return {
             "total_in": int(line_zone.in_count),
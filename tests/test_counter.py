@@ -0,0 +1,192 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("cv2")
+pytest.importorskip("supervision")
+pytest.importorskip("transformers")
+
+os.environ.setdefault("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true")
+
+from ml_engine.counter import CowCounterEngine, settings
+
+COW_ID = 21
+PERSON_ID = 1
+
+def make_engine():
+    # Skip __init__ so no model is downloaded or loaded
+    engine = CowCounterEngine.__new__(CowCounterEngine)
+    engine.allowed_class_ids = torch.tensor([COW_ID])
+    return engine
+
+def make_result(boxes, scores, labels=None):
+    return {
+        "boxes": torch.tensor(boxes, dtype=torch.float32).reshape(-1, 4),
+        "scores": torch.tensor(scores, dtype=torch.float32),
+        "labels": torch.tensor(labels if labels is not None else [COW_ID] * len(boxes), dtype=torch.long),
+    }
+
+class StubInputs(dict):
+    def to(self, device):
+        return self
+
+class StubProcessor:
+    """Records each batch and hands out canned per-tile results in order."""
+    def __init__(self, canned):
+        self.canned = list(canned)
+        self.calls = []
+        self.target_sizes = []
+
+    def __call__(self, images, **kwargs):
+        self.calls.append(([image.size for image in images], kwargs))
+        return StubInputs(batch_size=len(images))
+
+    def post_process_object_detection(self, outputs, target_sizes, threshold):
+        self.target_sizes.append(target_sizes.tolist())
+        batch, self.canned = self.canned[:outputs], self.canned[outputs:]
+        return batch
+
+def make_tiled_engine(canned):
+    engine = make_engine()
+    engine.device = torch.device("cpu")
+    engine.processor = StubProcessor(canned)
+    engine.model = lambda batch_size: batch_size
+    return engine
+
+def test_tile_origins_cover_frame():
+    """
+    Test 1: Tiles overlap, cover the full frame and the last one is flushed to the edge
+    """
+    origins, tile = CowCounterEngine._tile_origins(3840, 800, 160)
+    assert tile == 800
+    assert origins[0] == 0
+    assert origins[-1] + tile == 3840
+    for prev, nxt in zip(origins, origins[1:]):
+        assert prev + tile - nxt >= 160
+
+def test_tile_origins_frame_smaller_than_tile():
+    """
+    Test 2: A frame smaller than the tile becomes a single tile
+    """
+    assert CowCounterEngine._tile_origins(500, 800, 160) == ([0], 500)
+
+def test_tile_origins_rejects_overlap_not_smaller_than_tile():
+    """
+    Test 3: Overlap >= tile size is rejected instead of producing thousands of tiles
+    """
+    with pytest.raises(ValueError):
+        CowCounterEngine._tile_origins(3840, 800, 800)
+
+def test_batch_frames_keeps_trailing_partial_batch():
+    """
+    Test 4: Leftover frames are yielded as a final smaller batch
+    """
+    batches = list(CowCounterEngine._batch_frames(iter(range(5)), 2))
+    assert batches == [[0, 1], [2, 3], [4]]
+
+def test_merge_tile_results_shifts_boxes_to_frame():
+    """
+    Test 5: Tile-local boxes are moved back into frame coordinates
+    """
+    results = [make_result([[10, 10, 110, 110]], [0.9])]
+    offsets = torch.tensor([[640, 360, 640, 360]], dtype=torch.float32)
+
+    detections = make_engine()._merge_tile_results(results, [0], offsets, 1)
+
+    assert detections[0].xyxy.tolist() == [[650, 370, 750, 470]]
+
+def test_merge_tile_results_merges_seam_duplicate():
+    """
+    Test 6: A box cut off at a seam merges with the full box from the neighbouring tile
+    """
+    results = [
+        make_result([[700, 100, 820, 200]], [0.9]),  # Full cow in the left tile
+        make_result([[120, 100, 180, 200]], [0.8]),  # Right half in the right tile (IoU = 0.5)
+    ]
+    offsets = torch.tensor([[0, 0, 0, 0], [640, 0, 640, 0]], dtype=torch.float32)
+
+    detections = make_engine()._merge_tile_results(results, [0, 0], offsets, 1)
+
+    assert len(detections[0]) == 1
+    assert detections[0].xyxy.tolist() == [[700, 100, 820, 200]]
+
+def test_merge_tile_results_keeps_full_box_when_fragment_scores_higher():
+    """
+    Test 7: A higher-scoring seam fragment absorbs the full box instead of replacing it
+    """
+    results = [
+        make_result([[700, 100, 820, 200]], [0.8]),
+        make_result([[120, 100, 180, 200]], [0.95]),
+    ]
+    offsets = torch.tensor([[0, 0, 0, 0], [640, 0, 640, 0]], dtype=torch.float32)
+
+    detections = make_engine()._merge_tile_results(results, [0, 0], offsets, 1)
+
+    assert detections[0].xyxy.tolist() == [[700, 100, 820, 200]]
+    assert detections[0].confidence.tolist() == pytest.approx([0.95])
+
+def test_merge_tile_results_keeps_overlapping_boxes_from_same_tile():
+    """
+    Test 8: Crowded animals inside one tile are never merged with each other
+    """
+    results = [make_result([[100, 100, 300, 300], [150, 150, 250, 250]], [0.9, 0.8])]
+    offsets = torch.zeros((1, 4), dtype=torch.float32)
+
+    detections = make_engine()._merge_tile_results(results, [0], offsets, 1)
+
+    assert len(detections[0]) == 2
+
+def test_merge_tile_results_keeps_frames_separate():
+    """
+    Test 9: Overlapping boxes from different frames never suppress each other
+    """
+    results = [
+        make_result([[700, 100, 820, 200]], [0.9]),
+        make_result([[700, 100, 820, 200]], [0.8]),
+    ]
+    offsets = torch.zeros((2, 4), dtype=torch.float32)
+
+    detections = make_engine()._merge_tile_results(results, [0, 1], offsets, 2)
+
+    assert [len(d) for d in detections] == [1, 1]
+
+def test_detect_tiled_end_to_end(monkeypatch):
+    """
+    Test 10: Frames are tiled, batched at TILES_PER_BATCH and mapped back per frame
+    """
+    monkeypatch.setattr(settings, "TILE_SIZE", 800)
+    monkeypatch.setattr(settings, "TILE_OVERLAP", 160)
+    monkeypatch.setattr(settings, "TILES_PER_BATCH", 3)
+
+    # 1440x900 -> tile columns at x=0,640 and rows at y=0,100: 4 tiles per frame
+    empty = make_result([], [])
+    canned = [
+        make_result([[100, 100, 300, 300], [400, 400, 600, 600]], [0.9, 0.9], [COW_ID, PERSON_ID]),
+        empty, empty, empty,                                   # Frame 0
+        empty, empty, empty,
+        make_result([[0, 0, 200, 200]], [0.9]),                # Frame 1, tile at (640, 100)
+    ]
+    engine = make_tiled_engine(canned)
+    frames = [np.zeros((900, 1440, 3), dtype=np.uint8) for _ in range(2)]
+
+    detections = engine._detect_tiled(frames)
+
+    sizes, kwargs = zip(*engine.processor.calls)
+    assert [len(batch) for batch in sizes] == [3, 3, 2]
+    assert all(size == (800, 800) for batch in sizes for size in batch)
+    assert all(call_kwargs["do_resize"] is False for call_kwargs in kwargs)
+    assert engine.processor.target_sizes == [[[800, 800]] * 3, [[800, 800]] * 3, [[800, 800]] * 2]
+
+    assert detections[0].xyxy.tolist() == [[100, 100, 300, 300]]
+    assert detections[1].xyxy.tolist() == [[640, 100, 840, 300]]
+
+def test_detect_tiled_rejects_mixed_resolutions():
+    """
+    Test 11: Frames of different sizes in one batch are rejected
+    """
+    engine = make_tiled_engine([])
+    frames = [np.zeros((900, 1440, 3), dtype=np.uint8), np.zeros((720, 1280, 3), dtype=np.uint8)]
+
+    with pytest.raises(ValueError):
+        engine._detect_tiled(frames)